@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
 import sys
 import json
+from datetime import datetime
 from earthquake_prediction import EarthquakePrediction
 from flood_prediction import FloodPrediction
 from emergency_response import EmergencyResponseSystem
+from what_if import run_what_if, HAZARD_SPECS
+from prediction_archive import PredictionArchive, run_history_query
+from compound_risk import build_default_engine
+from dashboard_snapshot import DashboardSnapshot
+
+ALERT_COLORS = {'Low': 'green', 'Medium': 'yellow', 'High': 'orange', 'Critical': 'red'}
 
 class EmergencyAI:
     def __init__(self):
         self.earthquake_predictor = EarthquakePrediction()
         self.flood_predictor = FloodPrediction()
         self.emergency_system = EmergencyResponseSystem()
+        self.archive = PredictionArchive()
+        self.compound_engine = build_default_engine()
+        self.snapshot = DashboardSnapshot()
+        self.snapshot.load_teams(self.emergency_system.response_teams)
+        self.emergency_system.add_listener(self.snapshot)
     
     def predict_earthquake(self, data):
         """Predict earthquake risk and trigger emergency response if needed"""
@@ -39,6 +51,8 @@ class EmergencyAI:
             result['probability'] = result.get('probability', 0)
             result['risk_level'] = result.get('risk_level', 'Low')
             result['prediction_time'] = result.get('prediction_time', 'Unknown')
+            self.archive.append('earthquake', result)
+            self.snapshot.on_prediction('earthquake', result)
             
             # Auto-trigger emergency response for high-risk predictions
             if result.get('probability', 0) >= 75:
@@ -87,6 +101,8 @@ class EmergencyAI:
             result['probability'] = result.get('probability', 0)
             result['risk_level'] = result.get('risk_level', 'Low')
             result['prediction_time'] = result.get('prediction_time', 'Unknown')
+            self.archive.append('flood', result)
+            self.snapshot.on_prediction('flood', result)
             
             if result.get('probability', 0) >= 70:
                 emergency_response = self.emergency_system.declare_emergency(
@@ -108,34 +124,40 @@ class EmergencyAI:
             }
 
     
-    def get_emergency_status(self, location):
-        """Get overall emergency status for a location"""
-
-        earthquake_data = {
-            'location': location,
-            'seismic_activity': 5.0,
-            'geological_stress': 4.5,
-            'historical_frequency': 3.8,
-            'tectonic_movement': 4.2,
-            'ground_water_change': 2.5
-        }
+    def hazard_result(self, hazard, compound):
+        """Shape a hazard from a compound evaluation like the predictor's own result"""
+        predictor = self.earthquake_predictor if hazard == 'earthquake' else self.flood_predictor
+        assessment = compound['hazards'][hazard]
+        risk_level = assessment['risk_level']
         
-        flood_data = {
-            'location': location,
-            'rainfall_intensity': 6.5,
-            'river_water_level': 5.8,
-            'soil_saturation': 4.2,
-            'drainage_capacity': 6.0,
-            'elevation_risk': 3.5
+        result = {
+            'location': compound['location'],
+            'prediction_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'probability': assessment['probability'],
+            'risk_level': risk_level,
+            'alert_color': ALERT_COLORS[risk_level],
+            'factors': {factor: compound['features'][parameter]
+                        for parameter, factor, _ in HAZARD_SPECS[hazard]['parameters']},
+            'recommendations': predictor.get_recommendations(risk_level)
         }
+        if hazard == 'flood':
+            result['estimated_water_level'] = predictor.estimate_water_level(assessment['probability'])
+        return result
+    
+    def get_emergency_status(self, location):
+        """Get overall emergency status for a location"""
         
-        earthquake_result = self.predict_earthquake(earthquake_data)
-        flood_result = self.predict_flood(flood_data)
-        
-        eq_prob = earthquake_result.get('probability', 0)
-        flood_prob = flood_result.get('probability', 0)
+        # One compound pass computes the shared features and every hazard, interactions included
+        compound = self.compound_engine.evaluate(
+            [location], context={'emergency_system': self.emergency_system}
+        )[0]
+        earthquake_result = self.hazard_result('earthquake', compound)
+        flood_result = self.hazard_result('flood', compound)
+        self.snapshot.on_prediction('earthquake', earthquake_result)
+        self.snapshot.on_prediction('flood', flood_result)
         
-        overall_risk = max(eq_prob, flood_prob)
+        # The status band tracks the predicted hazards; fire and medical stay in compound_risk
+        overall_risk = max(earthquake_result['probability'], flood_result['probability'])
         
         if overall_risk < 30:
             overall_status = "Safe"
@@ -152,16 +174,30 @@ class EmergencyAI:
         
         active_emergencies = self.emergency_system.get_active_emergencies()
         
-        return {
+        result = {
             'location': location,
             'overall_status': overall_status,
             'status_color': status_color,
             'overall_risk': round(overall_risk, 2),
             'earthquake': earthquake_result,
             'flood': flood_result,
-            'active_emergencies': len(active_emergencies),
+            'compound_risk': compound,
+            'active_emergencies': self.snapshot.state['active_emergencies']['total'],
             'emergency_details': active_emergencies[:3] 
         }
+        self.snapshot.on_status(result)
+        return result
+    
+    def get_dashboard(self, since_version=None, epoch=None):
+        """
+        Dashboard view, or only the changes after since_version within the same epoch.
+        The epoch lives only as long as this process, so deltas need the long-running
+        'serve' mode; each one-shot CLI call starts a new epoch and returns the full
+        snapshot, which holds no cities or emergencies yet.
+        """
+        # Apply any team transitions that have come due before reporting
+        self.emergency_system.scheduler.advance()
+        return self.snapshot.changes_since(since_version, epoch)
     
     def handle_emergency_command(self, command, *args):
         """Handle emergency-related commands"""
@@ -176,6 +212,10 @@ class EmergencyAI:
             return self.emergency_system.get_active_emergencies()
         elif command == 'resources':
             return self.emergency_system.get_available_resources()
+        elif command == 'teams':
+            return self.emergency_system.get_team_status()
+        elif command == 'population':
+            return self.emergency_system.get_total_affected_population()
         elif command == 'update':
             if len(args) < 2:
                 return {'error': 'Insufficient parameters for update command'}
@@ -184,46 +224,96 @@ class EmergencyAI:
         else:
             return {'error': 'Unknown emergency command'}
 
-def main():
-    if len(sys.argv) < 2:
-        print(json.dumps({'error': 'No command provided'}))
-        return
+def run_command(ai, argv):
+    """Run one CLI-style command (argv without the script name) and return its result"""
+    if not argv:
+        return {'error': 'No command provided'}
     
-    command = sys.argv[1]
-    ai = EmergencyAI()
+    command = argv[0]
     
     if command == 'earthquake':
-        if len(sys.argv) < 3:
-            print(json.dumps({'error': 'No data provided'}))
-            return
-        data = json.loads(sys.argv[2])
-        result = ai.predict_earthquake(data)
-        print(json.dumps(result))
+        if len(argv) < 2:
+            return {'error': 'No data provided'}
+        return ai.predict_earthquake(json.loads(argv[1]))
     
     elif command == 'flood':
-        if len(sys.argv) < 3:
-            print(json.dumps({'error': 'No data provided'}))
-            return
-        data = json.loads(sys.argv[2])
-        result = ai.predict_flood(data)
-        print(json.dumps(result))
+        if len(argv) < 2:
+            return {'error': 'No data provided'}
+        return ai.predict_flood(json.loads(argv[1]))
     
     elif command == 'status':
-        location = sys.argv[2] if len(sys.argv) > 2 else 'Unknown Location'
-        result = ai.get_emergency_status(location)
-        print(json.dumps(result))
+        location = argv[1] if len(argv) > 1 else 'Unknown Location'
+        return ai.get_emergency_status(location)
+    
+    elif command == 'compound':
+        if len(argv) < 2:
+            return {'error': 'No data provided'}
+        data = json.loads(argv[1])
+        return ai.compound_engine.evaluate(
+            data.get('locations', []), data.get('inputs'),
+            context={'emergency_system': ai.emergency_system}
+        )
+    
+    elif command == 'dashboard':
+        since_version = None
+        if len(argv) > 1:
+            try:
+                since_version = int(argv[1])
+            except ValueError:
+                return {'error': 'Invalid version'}
+        epoch = argv[2] if len(argv) > 2 else None
+        return ai.get_dashboard(since_version, epoch)
+    
+    elif command == 'whatif':
+        if len(argv) < 2:
+            return {'error': 'No data provided'}
+        return run_what_if(json.loads(argv[1]))
+    
+    elif command == 'history':
+        ai.archive.flush()
+        data = json.loads(argv[1]) if len(argv) > 1 else {}
+        return run_history_query(data)
     
     elif command == 'emergency':
-        if len(sys.argv) < 3:
-            print(json.dumps({'error': 'No emergency command provided'}))
-            return
-        emergency_command = sys.argv[2]
-        args = sys.argv[3:] if len(sys.argv) > 3 else []
-        result = ai.handle_emergency_command(emergency_command, *args)
-        print(json.dumps(result))
+        if len(argv) < 2:
+            return {'error': 'No emergency command provided'}
+        return ai.handle_emergency_command(argv[1], *argv[2:])
     
     else:
-        print(json.dumps({'error': 'Unknown command'}))
+        return {'error': 'Unknown command'}
+
+def serve(ai):
+    """
+    Persistent mode: read one JSON array of CLI arguments per stdin line,
+    e.g. ["flood", "{...}"], and write one JSON result per stdout line.
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            result = run_command(ai, json.loads(line))
+        except Exception as e:
+            result = {'error': str(e)}
+        sys.stdout.write(json.dumps(result) + '\n')
+        sys.stdout.flush()
+
+def main():
+    if len(sys.argv) < 2:
+        print(json.dumps({'error': 'No command provided'}))
+        return
+    
+    ai = EmergencyAI()
+    
+    if sys.argv[1] == 'serve':
+        serve(ai)
+    else:
+        print(json.dumps(run_command(ai, sys.argv[1:])))
+    
+    try:
+        ai.archive.flush()
+    except Exception as e:
+        sys.stderr.write(f"Failed to write prediction archive: {e}\n")
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,20 @@
 
 const cities = [
-    { name: 'Karachi', province: 'Sindh', population: 14910352 },
-    { name: 'Lahore', province: 'Punjab', population: 11126285 },
-    { name: 'Faisalabad', province: 'Punjab', population: 3204726 },
-    { name: 'Rawalpindi', province: 'Punjab', population: 2098231 },
-    { name: 'Gujranwala', province: 'Punjab', population: 2027001 },
-    { name: 'Peshawar', province: 'Khyber Pakhtunkhwa', population: 1970042 },
-    { name: 'Multan', province: 'Punjab', population: 1871843 },
-    { name: 'Hyderabad', province: 'Sindh', population: 1734309 },
-    { name: 'Islamabad', province: 'Federal Capital', population: 1014825 },
-    { name: 'Quetta', province: 'Balochistan', population: 1001205 },
-    { name: 'Bahawalpur', province: 'Punjab', population: 762111 },
-    { name: 'Sargodha', province: 'Punjab', population: 659862 },
-    { name: 'Sialkot', province: 'Punjab', population: 655852 },
-    { name: 'Sukkur', province: 'Sindh', population: 499900 },
-    { name: 'Larkana', province: 'Sindh', population: 490508 }
+    { name: 'Karachi', province: 'Sindh', population: 14910352, lat: 24.8607, lng: 67.0011 },
+    { name: 'Lahore', province: 'Punjab', population: 11126285, lat: 31.5204, lng: 74.3587 },
+    { name: 'Faisalabad', province: 'Punjab', population: 3204726, lat: 31.4504, lng: 73.1350 },
+    { name: 'Rawalpindi', province: 'Punjab', population: 2098231, lat: 33.5651, lng: 73.0169 },
+    { name: 'Gujranwala', province: 'Punjab', population: 2027001, lat: 32.1877, lng: 74.1945 },
+    { name: 'Peshawar', province: 'Khyber Pakhtunkhwa', population: 1970042, lat: 34.0151, lng: 71.5249 },
+    { name: 'Multan', province: 'Punjab', population: 1871843, lat: 30.1575, lng: 71.5249 },
+    { name: 'Hyderabad', province: 'Sindh', population: 1734309, lat: 25.3960, lng: 68.3578 },
+    { name: 'Islamabad', province: 'Federal Capital', population: 1014825, lat: 33.6844, lng: 73.0479 },
+    { name: 'Quetta', province: 'Balochistan', population: 1001205, lat: 30.1798, lng: 66.9750 },
+    { name: 'Bahawalpur', province: 'Punjab', population: 762111, lat: 29.3544, lng: 71.6911 },
+    { name: 'Sargodha', province: 'Punjab', population: 659862, lat: 32.0836, lng: 72.6711 },
+    { name: 'Sialkot', province: 'Punjab', population: 655852, lat: 32.4945, lng: 74.5229 },
+    { name: 'Sukkur', province: 'Sindh', population: 499900, lat: 27.7052, lng: 68.8574 },
+    { name: 'Larkana', province: 'Sindh', population: 490508, lat: 27.5570, lng: 68.2264 }
 ];
 
 module.exports = cities;
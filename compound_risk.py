@@ -0,0 +1,263 @@
+import json
+import math
+import numpy as np
+from what_if import WhatIfEngine
+from population_grid import get_default_grid, find_city_coordinates
+
+RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+
+# Same defaults get_emergency_status has always used when no readings are supplied
+DEFAULT_INPUTS = {
+    'seismic_activity': 5.0,
+    'geological_stress': 4.5,
+    'historical_frequency': 3.8,
+    'tectonic_movement': 4.2,
+    'ground_water_change': 2.5,
+    'rainfall_intensity': 6.5,
+    'river_water_level': 5.8,
+    'soil_saturation': 4.2,
+    'drainage_capacity': 6.0,
+    'elevation_risk': 3.5
+}
+
+
+def input_feature(name, inverted=False):
+    """Extractor reading a 0-10 predictor input, flipped when higher values mean lower risk"""
+    def extract(location, inputs, context):
+        value = min(max(float(inputs.get(name, DEFAULT_INPUTS.get(name, 0))), 0), 10)
+        return 10 - value if inverted else value
+    return extract
+
+
+def population_density_feature(location, inputs, context):
+    """Population density within 5 km of the city centre, scaled so 10 ~ 25,000+ people per km2"""
+    coordinates = inputs.get('coordinates') or find_city_coordinates(location)
+    if not coordinates:
+        return 0.0
+    radius_km = 5
+    people = get_default_grid().population_in_radius(coordinates['lat'], coordinates['lng'], radius_km)
+    density = people / (math.pi * radius_km ** 2)
+    return min(density / 2500, 10)
+
+
+def active_incidents_feature(location, inputs, context):
+    """Active emergencies already declared at this location, capped at 10"""
+    emergency_system = context.get('emergency_system')
+    if emergency_system is None:
+        return 0.0
+    location = location.lower()
+    count = sum(1 for e in emergency_system.get_active_emergencies()
+                if location in e['location'].lower() or e['location'].lower() in location)
+    return float(min(count, 10))
+
+
+class CompoundRiskEngine:
+    """
+    Joint multi-hazard risk. Features are registered once and shared by every hazard;
+    each hazard is a weighted sum of features (probability = score * 10, capped at 100).
+
+    Interaction terms add weight * 100 * product(inputs) to a target hazard. Each input is
+    the excess of a hazard probability or feature over a floor, scaled to 0-1, so a term
+    contributes nothing until all of its inputs are elevated. Hazard floors default to the
+    hazard's 'High' threshold and feature floors to 0. Hazards are adjusted in dependency
+    order, so a hazard boosted by one term feeds its boosted value into the next.
+    """
+    def __init__(self):
+        self.features = []
+        self.extractors = {}
+        self.hazards = []
+        self.hazard_weights = {}
+        self.hazard_thresholds = {}
+        self.interactions = []
+        self.hazard_order = []
+
+    def register_feature(self, name, extractor):
+        if name not in self.extractors:
+            self.features.append(name)
+        self.extractors[name] = extractor
+
+    def register_hazard(self, name, weights, thresholds=(30, 60, 80)):
+        unknown = set(weights) - set(self.features)
+        if unknown:
+            raise ValueError(f"Unknown features for {name}: {sorted(unknown)}")
+        if name not in self.hazard_weights:
+            self.hazards.append(name)
+        self.hazard_weights[name] = weights
+        self.hazard_thresholds[name] = thresholds
+        self.hazard_order = self._dependency_order()
+
+    def add_interaction(self, name, inputs, target, weight, floors=None):
+        """Add a term; floors optionally maps an input name to the level where it starts to count"""
+        floors = floors or {}
+        for item in list(inputs) + [target]:
+            if item not in self.hazards and item not in self.features:
+                raise ValueError(f"Unknown hazard or feature in interaction {name}: {item}")
+        if target not in self.hazards:
+            raise ValueError(f"Interaction target must be a hazard: {target}")
+
+        resolved_floors = []
+        for item in inputs:
+            if item in floors:
+                resolved_floors.append(floors[item])
+            elif item in self.hazards:
+                resolved_floors.append(self.hazard_thresholds[item][1])
+            else:
+                resolved_floors.append(0)
+
+            # Excess is scaled by (ceiling - floor), so the floor must sit below the ceiling
+            ceiling = 100 if item in self.hazards else 10
+            if not resolved_floors[-1] < ceiling:
+                raise ValueError(f"Floor for {item} in interaction {name} must be below {ceiling}")
+
+        self.interactions.append({
+            'name': name, 'inputs': list(inputs), 'floors': resolved_floors,
+            'target': target, 'weight': weight
+        })
+        try:
+            self.hazard_order = self._dependency_order()
+        except ValueError:
+            self.interactions.pop()
+            raise
+
+    def _dependency_order(self):
+        """Hazards ordered so every hazard comes after the hazards its interaction terms read"""
+        depends_on = {hazard: set() for hazard in self.hazards}
+        for term in self.interactions:
+            depends_on[term['target']].update(item for item in term['inputs'] if item in self.hazards)
+
+        order = []
+        remaining = dict(depends_on)
+        while remaining:
+            ready = [hazard for hazard in self.hazards
+                     if hazard in remaining and not (remaining[hazard] - set(order))]
+            if not ready:
+                raise ValueError(f"Interaction terms form a cycle between: {sorted(remaining)}")
+            for hazard in ready:
+                order.append(hazard)
+                del remaining[hazard]
+        return order
+
+    def extract_features(self, locations, inputs_by_location=None, context=None):
+        """Compute every registered feature exactly once per location"""
+        inputs_by_location = inputs_by_location or {}
+        context = context or {}
+        matrix = np.zeros((len(locations), len(self.features)))
+        for i, location in enumerate(locations):
+            inputs = inputs_by_location.get(location, {})
+            for j, name in enumerate(self.features):
+                matrix[i, j] = self.extractors[name](location, inputs, context)
+        return matrix
+
+    def _weight_matrix(self):
+        weights = np.zeros((len(self.features), len(self.hazards)))
+        for j, hazard in enumerate(self.hazards):
+            for feature, weight in self.hazard_weights[hazard].items():
+                weights[self.features.index(feature), j] = weight
+        return weights
+
+    def _apply_interactions(self, base, features):
+        """Add interaction terms to each hazard in dependency order, as (locations, hazards)"""
+        compound = base.copy()
+        names = self.hazards + self.features
+        scales = np.array([100.0] * len(self.hazards) + [10.0] * len(self.features))
+
+        for hazard in self.hazard_order:
+            terms = [term for term in self.interactions if term['target'] == hazard]
+            if not terms:
+                continue
+
+            # Every input column as excess over its floor (0-1); padding columns stay at 1
+            arity = max(len(term['inputs']) for term in terms)
+            index = np.zeros((len(terms), arity), dtype=int)
+            floors = np.zeros((len(terms), arity))
+            active = np.zeros((len(terms), arity), dtype=bool)
+            for k, term in enumerate(terms):
+                count = len(term['inputs'])
+                index[k, :count] = [names.index(item) for item in term['inputs']]
+                floors[k, :count] = term['floors']
+                active[k, :count] = True
+            weights = np.array([term['weight'] * 100 for term in terms])
+
+            values = np.hstack([compound, features])[:, index]
+            ceilings = scales[index]
+            excess = np.clip((values - floors) / (ceilings - floors), 0, 1)
+            excess = np.where(active, excess, 1)
+
+            column = self.hazards.index(hazard)
+            boost = np.prod(excess, axis=2) @ weights
+            compound[:, column] = np.clip(compound[:, column] + boost, 0, 100)
+
+        return compound
+
+    def evaluate(self, locations, inputs_by_location=None, context=None):
+        """Evaluate all hazards and interaction terms for all locations in one pass"""
+        features = self.extract_features(locations, inputs_by_location, context)
+        base = np.minimum(features @ self._weight_matrix() * 10, 100)
+        compound = self._apply_interactions(base, features)
+
+        # Chance that at least one hazard occurs, treating the adjusted hazards as independent
+        joint = 100 * (1 - np.prod(1 - compound / 100, axis=1))
+        overall = compound.max(axis=1)
+
+        results = []
+        for i, location in enumerate(locations):
+            hazards = {}
+            for j, hazard in enumerate(self.hazards):
+                level = int(np.searchsorted(self.hazard_thresholds[hazard], compound[i, j], side='right'))
+                hazards[hazard] = {
+                    'base_probability': round(float(base[i, j]), 2),
+                    'interaction_boost': round(float(compound[i, j] - base[i, j]), 2),
+                    'probability': round(float(compound[i, j]), 2),
+                    'risk_level': RISK_LEVELS[level]
+                }
+            results.append({
+                'location': location,
+                'overall_risk': round(float(overall[i]), 2),
+                'joint_probability': round(float(joint[i]), 2),
+                'dominant_hazard': self.hazards[int(compound[i].argmax())],
+                'hazards': hazards,
+                'features': {name: round(float(features[i, j]), 2) for j, name in enumerate(self.features)}
+            })
+        return results
+
+
+def build_default_engine():
+    """Engine with the earthquake, flood, fire and medical hazards and their known interactions"""
+    engine = CompoundRiskEngine()
+
+    # Earthquake and flood reuse the predictors' own factors and weights
+    for hazard in ['earthquake', 'flood']:
+        model = WhatIfEngine(hazard)
+        for name, inverted in zip(model.parameters, model.inverted.tolist()):
+            engine.register_feature(name, input_feature(name, inverted))
+    engine.register_feature('population_density', population_density_feature)
+    engine.register_feature('active_incidents', active_incidents_feature)
+
+    for hazard, thresholds in [('earthquake', (30, 60, 80)), ('flood', (25, 50, 75))]:
+        model = WhatIfEngine(hazard)
+        engine.register_hazard(hazard, dict(zip(model.parameters, model.weights.tolist())), thresholds)
+    engine.register_hazard('fire', {'population_density': 0.3})
+    engine.register_hazard('medical', {'population_density': 0.2, 'active_incidents': 0.3})
+
+    engine.add_interaction('earthquake_dam_failure', ['earthquake', 'river_water_level'], 'flood', 0.4)
+    engine.add_interaction('rain_on_saturated_slopes', ['rainfall_intensity', 'soil_saturation'], 'flood', 0.3,
+                           floors={'rainfall_intensity': 5, 'soil_saturation': 5})
+    engine.add_interaction('post_earthquake_fire', ['earthquake', 'population_density'], 'fire', 0.5)
+    engine.add_interaction('earthquake_casualties', ['earthquake', 'population_density'], 'medical', 0.6)
+    engine.add_interaction('flood_casualties', ['flood', 'population_density'], 'medical', 0.4)
+    engine.add_interaction('fire_casualties', ['fire'], 'medical', 0.3)
+    return engine
+
+
+def test_compound_risk():
+    engine = build_default_engine()
+    results = engine.evaluate(
+        ['Karachi', 'Lahore', 'Quetta'],
+        {'Quetta': {'seismic_activity': 9, 'tectonic_movement': 8, 'river_water_level': 8}}
+    )
+    print("Compound Risk Test:")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    test_compound_risk()
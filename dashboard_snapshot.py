@@ -0,0 +1,143 @@
+import json
+import copy
+import uuid
+from collections import deque
+
+
+def severity_band(severity):
+    if severity <= 3:
+        return 'low'
+    elif severity <= 6:
+        return 'moderate'
+    elif severity <= 8:
+        return 'high'
+    return 'critical'
+
+
+class DashboardSnapshot:
+    """
+    Materialized dashboard view kept current from prediction, emergency and team events.
+
+    Every change bumps the version and is logged as (version, path, value), so a client
+    holding version v only needs the changes after v. Versions are only meaningful within
+    one snapshot instance, identified by its epoch; clients from another epoch, or older
+    than the retained log, receive the full snapshot instead. The snapshot is in-memory
+    and per process, so a one-shot CLI caller always gets a fresh, full snapshot; deltas
+    need a long-lived process such as 'ai_predictor.py serve'.
+    """
+    def __init__(self, history_size=1000):
+        self.epoch = uuid.uuid4().hex
+        self.version = 0
+        self.changes = deque(maxlen=history_size)
+        self.state = {
+            'cities': {},
+            'active_emergencies': {'total': 0, 'by_type': {}, 'by_severity': {}},
+            'available_teams': {'total': 0, 'by_type': {}}
+        }
+        self.team_types = {}
+
+    def _set(self, path, value):
+        node = self.state
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        if node.get(path[-1]) == value:
+            return
+        node[path[-1]] = value
+        self.version += 1
+        self.changes.append((self.version, tuple(path), copy.deepcopy(value)))
+
+    def _increment(self, path, delta):
+        node = self.state
+        for key in path[:-1]:
+            node = node.get(key, {})
+        self._set(path, node.get(path[-1], 0) + delta)
+
+    def load_teams(self, response_teams):
+        """Seed team counts from EmergencyResponseSystem.response_teams"""
+        for team_type, teams in response_teams.items():
+            for team in teams:
+                self.team_types[team['id']] = team_type
+                if team['status'] == 'available':
+                    self._increment(['available_teams', 'total'], 1)
+                    self._increment(['available_teams', 'by_type', team_type], 1)
+            self._increment(['available_teams', 'by_type', team_type], 0)
+
+    def on_prediction(self, hazard, result):
+        """Record the latest prediction for a city"""
+        if 'error' in result:
+            return
+        self._set(['cities', result.get('location', 'Unknown Location'), hazard], {
+            'probability': result.get('probability', 0),
+            'risk_level': result.get('risk_level', 'Low'),
+            'prediction_time': result.get('prediction_time', 'Unknown')
+        })
+
+    def on_status(self, status):
+        """Record the overall status computed by get_emergency_status"""
+        self._set(['cities', status['location'], 'overall'], {
+            'status': status['overall_status'],
+            'color': status['status_color'],
+            'risk': status['overall_risk']
+        })
+
+    def on_emergency_status(self, emergency, old_status, new_status):
+        """Adjust active counts when an emergency is declared (old_status None) or changes status"""
+        was_active = old_status == 'active'
+        is_active = new_status == 'active'
+        if was_active == is_active:
+            return
+        delta = 1 if is_active else -1
+        self._increment(['active_emergencies', 'total'], delta)
+        self._increment(['active_emergencies', 'by_type', emergency['type']], delta)
+        self._increment(['active_emergencies', 'by_severity', severity_band(emergency['severity'])], delta)
+
+    def on_team_transition(self, team, old_status, new_status):
+        """Adjust available team counts when a team leaves or returns to 'available'"""
+        if (old_status == 'available') == (new_status == 'available'):
+            return
+        delta = 1 if new_status == 'available' else -1
+        team_type = self.team_types.get(team['id'], team.get('type', 'unknown'))
+        self._increment(['available_teams', 'total'], delta)
+        self._increment(['available_teams', 'by_type', team_type], delta)
+
+    def snapshot(self):
+        return {'epoch': self.epoch, 'version': self.version, 'full': True, 'state': copy.deepcopy(self.state)}
+
+    def changes_since(self, version, epoch=None):
+        """Changes after version in the given epoch, keeping only the latest value per path"""
+        if version is None or epoch != self.epoch or version > self.version:
+            return self.snapshot()
+        oldest = self.changes[0][0] if self.changes else self.version + 1
+        if version < oldest - 1:
+            return self.snapshot()
+
+        latest = {}
+        for change_version, path, value in self.changes:
+            if change_version > version:
+                latest.pop(path, None)
+                latest[path] = value
+        return {
+            'epoch': self.epoch,
+            'version': self.version,
+            'full': False,
+            'changes': [{'path': list(path), 'value': value} for path, value in latest.items()]
+        }
+
+
+def test_snapshot():
+    from emergency_response import EmergencyResponseSystem
+
+    emergency_system = EmergencyResponseSystem()
+    snapshot = DashboardSnapshot()
+    snapshot.load_teams(emergency_system.response_teams)
+    emergency_system.add_listener(snapshot)
+
+    client_version = snapshot.version
+    emergency_system.simulate_emergency_scenario('flash_flood')
+
+    print("Dashboard Snapshot Test:")
+    print(json.dumps(snapshot.changes_since(client_version, snapshot.epoch), indent=2))
+
+
+if __name__ == "__main__":
+    test_snapshot()
@@ -3,10 +3,14 @@ import json
 import sys
 from datetime import datetime, timedelta
 import uuid
+from population_grid import get_default_grid, find_city_coordinates
+from team_scheduler import TeamScheduler
 
 class EmergencyResponseSystem:
-    def __init__(self):
+    def __init__(self, scheduler=None):
         self.active_emergencies = []
+        self.scheduler = scheduler or TeamScheduler()
+        self.listeners = []
         self.response_teams = {
             'medical': [
                 {'id': 'MED001', 'type': 'Ambulance', 'location': 'Karachi', 'status': 'available', 'capacity': 2},
@@ -81,10 +85,22 @@ class EmergencyResponseSystem:
                 ]
             }
         }
+        
+        for teams in self.response_teams.values():
+            for team in teams:
+                self.scheduler.register_team(team)
+    
+    def add_listener(self, listener):
+        """Register an object notified of emergency status changes and team transitions"""
+        self.listeners.append(listener)
+        self.scheduler.listeners.append(listener)
     
     def declare_emergency(self, emergency_type, location, severity, description, coordinates=None):
         """Declare a new emergency and initiate response"""
         emergency_id = str(uuid.uuid4())[:8]
+        coordinates = coordinates or find_city_coordinates(location)
+        radius_km = self.emergency_protocols.get(emergency_type, {}).get('evacuation_radius', 1)
+        affected_population = self.estimate_affected_population(severity, coordinates, radius_km)
         
         emergency = {
             'id': emergency_id,
@@ -97,21 +113,31 @@ class EmergencyResponseSystem:
             'declared_at': datetime.now().isoformat(),
             'estimated_resolution': None,
             'assigned_teams': [],
-            'affected_population': self.estimate_affected_population(severity),
-            'response_plan': self.generate_response_plan(emergency_type, severity)
+            'affected_population': affected_population,
+            'response_plan': self.generate_response_plan(emergency_type, severity, affected_population)
         }
         
-    
-        assigned_teams = self.assign_response_teams(emergency_type, location, severity)
-        emergency['assigned_teams'] = assigned_teams
-        
-
         protocol = self.emergency_protocols.get(emergency_type, {})
         base_response_time = protocol.get('response_time', 30)
         estimated_duration = base_response_time + (severity * 10) 
-        emergency['estimated_resolution'] = (datetime.now() + timedelta(minutes=estimated_duration)).isoformat()
+        resolution_time = datetime.fromtimestamp(self.scheduler.clock()) + timedelta(minutes=estimated_duration)
+        emergency['estimated_resolution'] = resolution_time.isoformat()
+        
+        assigned_teams = self.assign_response_teams(
+            emergency_type, location, severity,
+            emergency_id=emergency_id, coordinates=coordinates,
+            resolve_at=resolution_time.timestamp()
+        )
+        emergency['assigned_teams'] = assigned_teams
+        
+        # Push the estimate back when the nearest available teams arrive after it
+        arrivals = [datetime.fromisoformat(team['eta']) for team in assigned_teams]
+        if arrivals and max(arrivals) > resolution_time:
+            emergency['estimated_resolution'] = max(arrivals).isoformat()
         
         self.active_emergencies.append(emergency)
+        for listener in self.listeners:
+            listener.on_emergency_status(emergency, None, 'active')
         
         return {
             'emergency_id': emergency_id,
@@ -122,12 +148,19 @@ class EmergencyResponseSystem:
             'emergency_details': emergency
         }
     
-    def assign_response_teams(self, emergency_type, location, severity):
+    def assign_response_teams(self, emergency_type, location, severity, emergency_id=None,
+                              coordinates=None, resolve_at=None):
         """Assign appropriate response teams based on emergency type and severity"""
         protocol = self.emergency_protocols.get(emergency_type, {})
         required_team_types = protocol.get('required_teams', [])
+        response_time = protocol.get('response_time', 30)
+        if resolve_at is None:
+            resolve_at = self.scheduler.clock() + (response_time + severity * 10) * 60
         
-        assigned_teams = []
+        # Teams whose scheduled work has finished are available again
+        self.scheduler.advance()
+        
+        selected = []
         
         for team_type in required_team_types:
             available_teams = [team for team in self.response_teams.get(team_type, []) 
@@ -138,6 +171,13 @@ class EmergencyResponseSystem:
             other_teams = [team for team in available_teams if location.lower() not in team['location'].lower()]
             
             teams_to_assign = local_teams + other_teams
+            travel_minutes = {team['id']: self.scheduler.travel_minutes(team, coordinates, response_time)
+                              for team in teams_to_assign}
+            
+            # Closest teams first, so teams that can arrive before the expected resolution are
+            # preferred; when too few can, the nearest of the rest still go
+            if coordinates:
+                teams_to_assign.sort(key=lambda team: travel_minutes[team['id']])
             
     
             teams_needed = min(severity // 3 + 1, len(teams_to_assign))
@@ -145,23 +185,39 @@ class EmergencyResponseSystem:
             for i in range(teams_needed):
                 if i < len(teams_to_assign):
                     team = teams_to_assign[i]
-                    team['status'] = 'deployed'
-                    team['assigned_at'] = datetime.now().isoformat()
-                    assigned_teams.append(team)
+                    selected.append((team, travel_minutes[team['id']]))
+        
+        # The emergency cannot resolve before its last team arrives
+        now = self.scheduler.clock()
+        if selected:
+            resolve_at = max(resolve_at, now + max(travel for _, travel in selected) * 60)
+        
+        assigned_teams = []
+        for team, travel in selected:
+            self.scheduler.dispatch(team, emergency_id, coordinates, travel, resolve_at)
+            assigned_teams.append(team)
         
         return assigned_teams
     
-    def estimate_affected_population(self, severity):
-        """Estimate affected population based on severity"""
+    def estimate_affected_population(self, severity, coordinates=None, radius_km=None):
+        """Estimate affected population inside the evacuation zone, or from severity when the location is unknown"""
+        if coordinates and radius_km and (coordinates.get('lat') or coordinates.get('lng')):
+            population = get_default_grid().population_in_radius(
+                coordinates['lat'], coordinates['lng'], radius_km
+            )
+            return int(round(population))
+        
         base_population = {
             1: 10, 2: 25, 3: 50, 4: 100, 5: 250,
             6: 500, 7: 1000, 8: 2500, 9: 5000, 10: 10000
         }
         return base_population.get(severity, 100)
     
-    def generate_response_plan(self, emergency_type, severity):
+    def generate_response_plan(self, emergency_type, severity, affected_population=None):
         """Generate a detailed response plan"""
         protocol = self.emergency_protocols.get(emergency_type, {})
+        if affected_population is None:
+            affected_population = self.estimate_affected_population(severity)
         
         plan = {
             'priority_level': protocol.get('priority', 'medium'),
@@ -169,7 +225,7 @@ class EmergencyResponseSystem:
             'evacuation_required': severity >= 6,
             'evacuation_radius_km': protocol.get('evacuation_radius', 1),
             'medical_facilities_needed': severity >= 5,
-            'shelter_capacity_needed': self.estimate_affected_population(severity) if severity >= 7 else 0,
+            'shelter_capacity_needed': affected_population if severity >= 7 else 0,
             'estimated_duration_hours': severity * 2,
             'resource_requirements': self.calculate_resource_requirements(emergency_type, severity)
         }
@@ -213,6 +269,7 @@ class EmergencyResponseSystem:
         """Update the status of an active emergency"""
         for emergency in self.active_emergencies:
             if emergency['id'] == emergency_id:
+                old_status = emergency['status']
                 emergency['status'] = new_status
                 emergency['last_updated'] = datetime.now().isoformat()
                 
@@ -227,8 +284,11 @@ class EmergencyResponseSystem:
                 
                 if new_status in ['resolved', 'closed']:
                     for team in emergency['assigned_teams']:
-                        team['status'] = 'available'
-                        team['assigned_at'] = None
+                        if team.get('emergency_id') == emergency_id:
+                            self.scheduler.release(team)
+                
+                for listener in self.listeners:
+                    listener.on_emergency_status(emergency, old_status, new_status)
                 
                 return {'success': True, 'emergency': emergency}
         
@@ -238,6 +298,25 @@ class EmergencyResponseSystem:
         """Get all active emergencies"""
         return [e for e in self.active_emergencies if e['status'] == 'active']
     
+    def get_total_affected_population(self):
+        """Population inside the union of all active evacuation zones, counting overlaps once"""
+        zones = []
+        unlocated = 0
+        for emergency in self.get_active_emergencies():
+            coordinates = emergency.get('coordinates') or {}
+            if coordinates.get('lat') or coordinates.get('lng'):
+                radius_km = emergency['response_plan'].get('evacuation_radius_km', 1)
+                zones.append((coordinates['lat'], coordinates['lng'], radius_km))
+            else:
+                unlocated += emergency.get('affected_population', 0)
+        
+        located = get_default_grid().population_in_zones(zones) if zones else 0
+        return {
+            'total_affected_population': int(round(located)) + unlocated,
+            'zones': len(zones),
+            'unlocated_emergencies_population': unlocated
+        }
+    
     def get_emergency_by_id(self, emergency_id):
         """Get specific emergency by ID"""
         for emergency in self.active_emergencies:
@@ -247,11 +326,20 @@ class EmergencyResponseSystem:
     
     def get_available_resources(self):
         """Get all available response teams and resources"""
+        self.scheduler.advance()
         available_resources = {}
         for team_type, teams in self.response_teams.items():
             available_resources[team_type] = [team for team in teams if team['status'] == 'available']
         return available_resources
     
+    def get_team_status(self):
+        """Get every response team with its lifecycle state and next scheduled transition"""
+        transitions = self.scheduler.advance()
+        return {
+            'teams': self.response_teams,
+            'transitions_applied': transitions
+        }
+    
     def simulate_emergency_scenario(self, scenario_type):
         """Simulate different emergency scenarios for testing"""
         scenarios = {
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from population_grid import get_city_table
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ai_predictor.py')
+
+# Share of each verb in the synthetic mix, roughly what the web pages send
+DEFAULT_MIX = {
+    'earthquake': 0.3,
+    'flood': 0.3,
+    'status': 0.25,
+    'emergency': 0.15
+}
+
+EMERGENCY_VERBS = ['active', 'resources', 'simulate', 'declare']
+SCENARIOS = ['major_earthquake', 'flash_flood', 'building_fire', 'medical_emergency']
+
+
+def factor(rng):
+    return round(rng.uniform(0, 10), 1)
+
+
+def synthetic_requests(count, mix=None, seed=None):
+    """Generate CLI argument lists like the ones server.js runPythonScript sends"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    verbs = list(mix.keys())
+    weights = list(mix.values())
+    cities = [city['name'] for city in get_city_table()]
+
+    requests = []
+    for _ in range(count):
+        verb = rng.choices(verbs, weights)[0]
+        city = rng.choice(cities)
+
+        if verb == 'earthquake':
+            data = {
+                'location': city,
+                'seismic_activity': factor(rng),
+                'geological_stress': factor(rng),
+                'historical_frequency': factor(rng),
+                'tectonic_movement': factor(rng),
+                'ground_water_change': factor(rng)
+            }
+            requests.append(['earthquake', json.dumps(data)])
+        elif verb == 'flood':
+            data = {
+                'location': city,
+                'rainfall_intensity': factor(rng),
+                'river_water_level': factor(rng),
+                'soil_saturation': factor(rng),
+                'drainage_capacity': factor(rng),
+                'elevation_risk': factor(rng)
+            }
+            requests.append(['flood', json.dumps(data)])
+        elif verb == 'status':
+            requests.append(['status', city])
+        else:
+            emergency_verb = rng.choice(EMERGENCY_VERBS)
+            if emergency_verb == 'simulate':
+                requests.append(['emergency', 'simulate', rng.choice(SCENARIOS)])
+            elif emergency_verb == 'declare':
+                emergency_type = rng.choice(['earthquake', 'flood', 'fire', 'medical'])
+                requests.append(['emergency', 'declare', emergency_type, city,
+                                 str(rng.randint(1, 10)), f"Load test {emergency_type} in {city}"])
+            else:
+                requests.append(['emergency', emergency_verb])
+    return requests
+
+
+def recorded_requests(path):
+    """
+    Load a recorded request log: one JSON array of CLI arguments per line,
+    e.g. ["flood", "{\"location\": \"Lahore\", ...}"]
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_test_env(archive_dir=None):
+    """
+    Environment for predictor processes under test. Predictions go to a throwaway
+    archive unless archive_dir is given, so load runs never touch the real history.
+    """
+    env = dict(os.environ)
+    env['PREDICTION_ARCHIVE_DIR'] = archive_dir or tempfile.mkdtemp(prefix='load_test_archive_')
+    return env
+
+
+class CliTarget:
+    """Spawns one predictor process per request, as runPythonScript does"""
+    name = 'cli'
+
+    def __init__(self, python=sys.executable, script=SCRIPT, archive_dir=None):
+        self.python = python
+        self.script = script
+        self.env = load_test_env(archive_dir)
+
+    def start(self, concurrency):
+        pass
+
+    def stop(self):
+        pass
+
+    def send(self, argv):
+        completed = subprocess.run([self.python, self.script] + argv, capture_output=True, text=True,
+                                   env=self.env)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'non-zero exit')
+        return json.loads(completed.stdout)
+
+
+class ServeTarget:
+    """Keeps a pool of persistent 'ai_predictor.py serve' workers, one request in flight each"""
+    name = 'serve'
+
+    def __init__(self, python=sys.executable, script=SCRIPT, archive_dir=None):
+        self.python = python
+        self.script = script
+        self.env = load_test_env(archive_dir)
+        self.workers = []
+        self.idle = []
+        self.condition = threading.Condition()
+
+    def start(self, concurrency):
+        for _ in range(concurrency):
+            worker = subprocess.Popen(
+                [self.python, self.script, 'serve'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1, env=self.env
+            )
+            self.workers.append(worker)
+
+        # Wait for every worker to finish importing before the clock starts
+        for worker in self.workers:
+            worker.stdin.write('[]\n')
+            worker.stdin.flush()
+            worker.stdout.readline()
+        self.idle = list(self.workers)
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stdin.close()
+            worker.wait()
+        self.workers = []
+        self.idle = []
+
+    def send(self, argv):
+        with self.condition:
+            while not self.idle:
+                self.condition.wait()
+            worker = self.idle.pop()
+        try:
+            worker.stdin.write(json.dumps(argv) + '\n')
+            worker.stdin.flush()
+            line = worker.stdout.readline()
+            if not line:
+                raise RuntimeError('worker exited')
+            return json.loads(line)
+        finally:
+            with self.condition:
+                self.idle.append(worker)
+                self.condition.notify()
+
+
+def run_load(target, requests, rate, concurrency):
+    """
+    Open-loop replay: requests are issued on a fixed schedule at `rate` per second
+    with at most `concurrency` in flight. Latency is measured from the scheduled
+    send time, so queueing delay under overload is included.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    interval = 1.0 / rate if rate else 0
+
+    def issue(argv, scheduled):
+        try:
+            result = target.send(argv)
+            failed = isinstance(result, dict) and 'error' in result
+            error = result.get('error') if failed else None
+        except Exception as e:
+            failed, error = True, str(e)
+        with lock:
+            latencies.append(time.perf_counter() - scheduled)
+            if failed:
+                errors.append(error)
+
+    target.start(concurrency)
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for i, argv in enumerate(requests):
+                scheduled = started + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(issue, argv, scheduled)
+    finally:
+        target.stop()
+    elapsed = time.perf_counter() - started
+
+    latency_ms = np.array(latencies) * 1000
+    return {
+        'target': target.name,
+        'offered_rate': rate,
+        'concurrency': concurrency,
+        'requests': len(requests),
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(requests) / elapsed, 2) if elapsed else 0,
+        'error_rate': round(len(errors) / len(requests), 4) if requests else 0,
+        'errors': sorted(set(str(error) for error in errors))[:5],
+        'latency_ms': {
+            'mean': round(float(latency_ms.mean()), 2),
+            'p50': round(float(np.percentile(latency_ms, 50)), 2),
+            'p90': round(float(np.percentile(latency_ms, 90)), 2),
+            'p95': round(float(np.percentile(latency_ms, 95)), 2),
+            'p99': round(float(np.percentile(latency_ms, 99)), 2),
+            'max': round(float(latency_ms.max()), 2)
+        } if len(latency_ms) else {}
+    }
+
+
+def find_saturation(target, requests, rates, concurrency, latency_factor=3.0, min_efficiency=0.9):
+    """
+    Step through increasing offered rates. The saturation point is the first rate
+    where achieved throughput falls below min_efficiency of the offered rate, or p95
+    latency exceeds latency_factor times the p95 at the lowest rate.
+    """
+    steps = []
+    saturation = None
+    baseline_p95 = None
+    for rate in rates:
+        step = run_load(target, requests, rate, concurrency)
+        steps.append(step)
+        p95 = step['latency_ms'].get('p95', 0)
+        if baseline_p95 is None:
+            baseline_p95 = p95
+        if step['throughput_rps'] < rate * min_efficiency or p95 > baseline_p95 * latency_factor:
+            saturation = rate
+            break
+
+    return {
+        'steps': steps,
+        'saturation_rate': saturation,
+        'max_sustained_rps': max((step['throughput_rps'] for step in steps
+                                  if step['offered_rate'] != saturation), default=0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay predictor traffic against ai_predictor.py')
+    parser.add_argument('--target', choices=['cli', 'serve'], default='cli')
+    parser.add_argument('--rate', type=float, default=10, help='requests per second')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=100, help='synthetic request count')
+    parser.add_argument('--replay', help='JSONL file of recorded CLI argument lists')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--sweep', help='comma-separated rates to search for the saturation point')
+    parser.add_argument('--archive-dir', help='prediction archive to write to (default: a temporary directory)')
+    args = parser.parse_args()
+
+    requests = recorded_requests(args.replay) if args.replay else synthetic_requests(args.requests, seed=args.seed)
+
+    with tempfile.TemporaryDirectory(prefix='load_test_archive_') as scratch_dir:
+        archive_dir = args.archive_dir or scratch_dir
+        target = ServeTarget(archive_dir=archive_dir) if args.target == 'serve' else CliTarget(archive_dir=archive_dir)
+
+        if args.sweep:
+            rates = [float(rate) for rate in args.sweep.split(',')]
+            result = find_saturation(target, requests, rates, args.concurrency)
+        else:
+            result = run_load(target, requests, args.rate, args.concurrency)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import math
+import numpy as np
+
+KM_PER_DEGREE = 111.32
+CITIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cities.js')
+
+
+def load_city_table(path=CITIES_FILE):
+    """Load the city table (name, province, population, lat, lng) from cities.js"""
+    pattern = re.compile(
+        r"name:\s*'([^']+)',\s*province:\s*'([^']+)',\s*population:\s*(\d+),"
+        r"\s*lat:\s*(-?[\d.]+),\s*lng:\s*(-?[\d.]+)"
+    )
+    with open(path) as f:
+        source = f.read()
+
+    cities = []
+    for name, province, population, lat, lng in pattern.findall(source):
+        cities.append({
+            'name': name,
+            'province': province,
+            'population': int(population),
+            'lat': float(lat),
+            'lng': float(lng)
+        })
+    return cities
+
+
+class PopulationGrid:
+    """
+    Gridded population raster on a regular lat/lng grid.
+    Row-wise prefix sums make every circle query cost O(rows in the circle).
+    """
+    def __init__(self, values, origin_lat, origin_lng, cell_deg):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.origin_lat = origin_lat
+        self.origin_lng = origin_lng
+        self.cell_deg = cell_deg
+        self.rows, self.cols = self.values.shape
+
+        # prefix[r, c] = population of cells [0, c) in row r
+        self.prefix = np.zeros((self.rows, self.cols + 1))
+        np.cumsum(self.values, axis=1, out=self.prefix[:, 1:])
+
+    @classmethod
+    def from_npy(cls, path, origin_lat, origin_lng, cell_deg):
+        """Load a population raster saved as a 2D .npy array (row 0 = origin_lat)"""
+        return cls(np.load(path), origin_lat, origin_lng, cell_deg)
+
+    @classmethod
+    def from_cities(cls, cities, cell_deg=0.01, margin_deg=0.5):
+        """Build a raster by spreading each city's population around its centre"""
+        lats = [city['lat'] for city in cities]
+        lngs = [city['lng'] for city in cities]
+        origin_lat = min(lats) - margin_deg
+        origin_lng = min(lngs) - margin_deg
+        rows = int(math.ceil((max(lats) + margin_deg - origin_lat) / cell_deg))
+        cols = int(math.ceil((max(lngs) + margin_deg - origin_lng) / cell_deg))
+        values = np.zeros((rows, cols))
+
+        for city in cities:
+            # Urban footprint grows with the square root of the population
+            sigma_km = 2.5 * math.sqrt(city['population'] / 1e6)
+            sigma_rows = max(sigma_km / KM_PER_DEGREE / cell_deg, 0.5)
+            sigma_cols = max(sigma_rows / math.cos(math.radians(city['lat'])), 0.5)
+
+            center_row = (city['lat'] - origin_lat) / cell_deg
+            center_col = (city['lng'] - origin_lng) / cell_deg
+            r0 = max(int(center_row - 3 * sigma_rows), 0)
+            r1 = min(int(center_row + 3 * sigma_rows) + 1, rows)
+            c0 = max(int(center_col - 3 * sigma_cols), 0)
+            c1 = min(int(center_col + 3 * sigma_cols) + 1, cols)
+
+            dr = (np.arange(r0, r1) + 0.5 - center_row) / sigma_rows
+            dc = (np.arange(c0, c1) + 0.5 - center_col) / sigma_cols
+            kernel = np.exp(-0.5 * (dr[:, None] ** 2 + dc[None, :] ** 2))
+            values[r0:r1, c0:c1] += city['population'] * kernel / kernel.sum()
+
+        return cls(values, origin_lat, origin_lng, cell_deg)
+
+    def _row_spans(self, lat, lng, radius_km):
+        """Return (rows, start_cols, end_cols) of cells whose centres lie inside the circle"""
+        radius_deg = radius_km / KM_PER_DEGREE
+        r0 = max(int(math.floor((lat - radius_deg - self.origin_lat) / self.cell_deg)), 0)
+        r1 = min(int(math.ceil((lat + radius_deg - self.origin_lat) / self.cell_deg)), self.rows)
+        if r0 >= r1:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+        rows = np.arange(r0, r1)
+        row_lat = self.origin_lat + (rows + 0.5) * self.cell_deg
+        dy_km = (row_lat - lat) * KM_PER_DEGREE
+        half_km = np.sqrt(np.clip(radius_km ** 2 - dy_km ** 2, 0, None))
+        half_deg = half_km / (KM_PER_DEGREE * np.cos(np.radians(row_lat)))
+
+        # Cell c is inside when its centre origin + (c + 0.5) * cell lies within lng +/- half
+        start = np.ceil((lng - half_deg - self.origin_lng) / self.cell_deg - 0.5).astype(int)
+        end = np.floor((lng + half_deg - self.origin_lng) / self.cell_deg - 0.5).astype(int) + 1
+        start = np.clip(start, 0, self.cols)
+        end = np.clip(end, 0, self.cols)
+
+        inside = (np.abs(dy_km) <= radius_km) & (end > start)
+        return rows[inside], start[inside], end[inside]
+
+    def _cell_index(self, lat, lng):
+        return int((lat - self.origin_lat) / self.cell_deg), int((lng - self.origin_lng) / self.cell_deg)
+
+    def _point_density(self, lat, lng):
+        """Population per square km of the cell containing the point"""
+        row, col = self._cell_index(lat, lng)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return 0.0
+        cell_lat = self.origin_lat + (row + 0.5) * self.cell_deg
+        cell_area_km2 = (self.cell_deg * KM_PER_DEGREE) ** 2 * math.cos(math.radians(cell_lat))
+        return self.values[row, col] / cell_area_km2
+
+    def population_in_radius(self, lat, lng, radius_km):
+        """Population inside a circular zone"""
+        rows, start, end = self._row_spans(lat, lng, radius_km)
+        if len(rows) == 0:
+            # Zone smaller than a cell: scale the local density by the zone area
+            return self._point_density(lat, lng) * math.pi * radius_km ** 2
+        return float(np.sum(self.prefix[rows, end] - self.prefix[rows, start]))
+
+    def population_in_zones(self, zones):
+        """
+        Population inside the union of circular zones (lat, lng, radius_km).
+        Overlapping spans are merged per row so no cell is counted twice. Zones smaller
+        than a cell count as a partial cell, skipped when a larger zone already covers it.
+        """
+        spans_by_row = {}
+        partial_cells = {}
+        for lat, lng, radius_km in zones:
+            rows, start, end = self._row_spans(lat, lng, radius_km)
+            if len(rows) == 0:
+                cell = self._cell_index(lat, lng)
+                population = self._point_density(lat, lng) * math.pi * radius_km ** 2
+                # Several small zones in one cell: keep the largest rather than summing
+                partial_cells[cell] = max(partial_cells.get(cell, 0.0), population)
+                continue
+            for row, c0, c1 in zip(rows.tolist(), start.tolist(), end.tolist()):
+                spans_by_row.setdefault(row, []).append((c0, c1))
+
+        total = 0.0
+        merged_by_row = {}
+        for row, spans in spans_by_row.items():
+            spans.sort()
+            merged = [list(spans[0])]
+            for c0, c1 in spans[1:]:
+                if c0 > merged[-1][1]:
+                    merged.append([c0, c1])
+                else:
+                    merged[-1][1] = max(merged[-1][1], c1)
+            merged_by_row[row] = merged
+            for c0, c1 in merged:
+                total += self.prefix[row, c1] - self.prefix[row, c0]
+
+        for (row, col), population in partial_cells.items():
+            covered = any(c0 <= col < c1 for c0, c1 in merged_by_row.get(row, []))
+            if population > 0 and not covered:
+                total += min(population, self.values[row, col])
+
+        return float(total)
+
+
+_default_grid = None
+_city_table = None
+
+
+def get_city_table():
+    """City table from cities.js, loaded once per process"""
+    global _city_table
+    if _city_table is None:
+        _city_table = load_city_table()
+    return _city_table
+
+
+def get_default_grid():
+    """Population grid built from the city table, built once per process"""
+    global _default_grid
+    if _default_grid is None:
+        _default_grid = PopulationGrid.from_cities(get_city_table())
+    return _default_grid
+
+
+def find_city_coordinates(location):
+    """Resolve a location string such as 'Karachi, Pakistan' to city coordinates"""
+    if not location:
+        return None
+    location = location.lower()
+    for city in get_city_table():
+        if city['name'].lower() in location:
+            return {'lat': city['lat'], 'lng': city['lng']}
+    return None
+
+
+def test_population_grid():
+    grid = get_default_grid()
+    karachi = find_city_coordinates('Karachi, Pakistan')
+    lahore = find_city_coordinates('Lahore')
+
+    single = grid.population_in_radius(karachi['lat'], karachi['lng'], 5)
+    overlapping = grid.population_in_zones([
+        (karachi['lat'], karachi['lng'], 5),
+        (karachi['lat'] + 0.02, karachi['lng'], 5),
+        (lahore['lat'], lahore['lng'], 3)
+    ])
+
+    print("Population Grid Test:")
+    print(json.dumps({
+        'grid_shape': [grid.rows, grid.cols],
+        'karachi_5km': round(single),
+        'union_of_zones': round(overlapping)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    test_population_grid()
@@ -0,0 +1,306 @@
+import os
+import json
+import time
+from datetime import datetime
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ARCHIVE_DIR = os.environ.get(
+    'PREDICTION_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prediction_archive')
+)
+
+HAZARDS = ['earthquake', 'flood']
+RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+FACTOR_COUNT = 5
+
+COLUMN_DTYPES = {
+    'timestamp': np.float64,
+    'location': np.int32,
+    'hazard': np.int8,
+    'probability': np.float32,
+    'risk_level': np.int8,
+    'factors': np.float32
+}
+
+
+def to_epoch(value):
+    """Accept epoch seconds or an ISO date string"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value).timestamp()
+
+
+class PredictionArchive:
+    """
+    Append-only columnar archive of prediction results.
+
+    Each chunk is a directory holding one .npy file per column. The manifest keeps
+    per-chunk time bounds and location codes, so range queries open only the chunks
+    and columns they need. Appends are buffered in memory; on flush the buffer is
+    merged into the open tail chunk until it reaches chunk_size rows, then sealed.
+    chunk_size stays small because each flush rewrites the tail chunk's columns.
+    """
+    def __init__(self, path=ARCHIVE_DIR, chunk_size=4096, buffer_size=1000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.manifest_path = os.path.join(path, 'manifest.json')
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {'locations': [], 'factor_names': {}, 'chunks': []}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, self.manifest_path)
+
+    def _lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        lock_file = open(os.path.join(self.path, '.lock'), 'w')
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def append(self, hazard, result, timestamp=None):
+        """Buffer one prediction result from EarthquakePrediction or FloodPrediction"""
+        if hazard not in HAZARDS or 'error' in result or result.get('risk_level') not in RISK_LEVELS:
+            return False
+
+        self.buffer.append({
+            'timestamp': timestamp if timestamp is not None else time.time(),
+            'location': result.get('location', 'Unknown Location'),
+            'hazard': hazard,
+            'probability': result.get('probability', 0),
+            'risk_level': result['risk_level'],
+            'factors': result.get('factors', {})
+        })
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Write buffered rows to disk"""
+        if not self.buffer:
+            return 0
+
+        rows = self.buffer
+        self.buffer = []
+        lock_file = self._lock()
+        try:
+            manifest = self._load_manifest()
+            locations = manifest['locations']
+            factor_names = manifest['factor_names']
+
+            for row in rows:
+                if row['location'] not in locations:
+                    locations.append(row['location'])
+                if row['hazard'] not in factor_names:
+                    factor_names[row['hazard']] = list(row['factors'].keys())[:FACTOR_COUNT]
+
+            columns = {
+                'timestamp': np.array([row['timestamp'] for row in rows]),
+                'location': np.array([locations.index(row['location']) for row in rows]),
+                'hazard': np.array([HAZARDS.index(row['hazard']) for row in rows]),
+                'probability': np.array([row['probability'] for row in rows]),
+                'risk_level': np.array([RISK_LEVELS.index(row['risk_level']) for row in rows]),
+                'factors': np.array([
+                    [row['factors'].get(name, 0) for name in factor_names[row['hazard']]]
+                    + [0] * (FACTOR_COUNT - len(factor_names[row['hazard']]))
+                    for row in rows
+                ])
+            }
+            columns = {name: values.astype(COLUMN_DTYPES[name]) for name, values in columns.items()}
+
+            offset = 0
+            while offset < len(rows):
+                chunk = manifest['chunks'][-1] if manifest['chunks'] else None
+                if chunk is None or chunk['rows'] >= self.chunk_size:
+                    chunk = {'name': f"chunk_{len(manifest['chunks']):06d}", 'rows': 0,
+                             'min_time': None, 'max_time': None, 'locations': []}
+                    manifest['chunks'].append(chunk)
+
+                take = min(self.chunk_size - chunk['rows'], len(rows) - offset)
+                part = {name: values[offset:offset + take] for name, values in columns.items()}
+                self._write_chunk(chunk, part)
+                offset += take
+
+            self._save_manifest(manifest)
+        finally:
+            lock_file.close()
+        return len(rows)
+
+    def _write_chunk(self, chunk, part):
+        chunk_dir = os.path.join(self.path, chunk['name'])
+        os.makedirs(chunk_dir, exist_ok=True)
+
+        for name, values in part.items():
+            column_path = os.path.join(chunk_dir, f"{name}.npy")
+            if chunk['rows']:
+                # Drop any rows left behind by a flush that died before saving the manifest
+                values = np.concatenate([np.load(column_path)[:chunk['rows']], values])
+            temp_path = column_path + '.tmp.npy'
+            np.save(temp_path, values)
+            os.replace(temp_path, column_path)
+
+        times = part['timestamp']
+        chunk['rows'] += len(times)
+        chunk['min_time'] = min(float(times.min()), chunk['min_time'] if chunk['min_time'] is not None else np.inf)
+        chunk['max_time'] = max(float(times.max()), chunk['max_time'] if chunk['max_time'] is not None else -np.inf)
+        chunk['locations'] = sorted(set(chunk['locations']) | set(part['location'].tolist()))
+
+    def _select(self, location, hazard, start, end, columns):
+        """Load the requested columns for rows matching the filters, pruning chunks by manifest"""
+        manifest = self._load_manifest()
+        start, end = to_epoch(start), to_epoch(end)
+        location_code = None
+        if location is not None:
+            if location not in manifest['locations']:
+                return manifest, {name: np.empty(0, dtype=COLUMN_DTYPES[name]) for name in columns}
+            location_code = manifest['locations'].index(location)
+        hazard_code = HAZARDS.index(hazard) if hazard is not None else None
+
+        selected = {name: [] for name in columns}
+        for chunk in manifest['chunks']:
+            if start is not None and chunk['max_time'] < start:
+                continue
+            if end is not None and chunk['min_time'] >= end:
+                continue
+            if location_code is not None and location_code not in chunk['locations']:
+                continue
+
+            chunk_dir = os.path.join(self.path, chunk['name'])
+            loaded = {}
+
+            def column(name):
+                if name not in loaded:
+                    # The tail chunk may hold rows newer than this manifest snapshot
+                    values = np.load(os.path.join(chunk_dir, f"{name}.npy"), mmap_mode='r')
+                    loaded[name] = values[:chunk['rows']]
+                return loaded[name]
+
+            mask = np.ones(chunk['rows'], dtype=bool)
+            if start is not None:
+                mask &= column('timestamp') >= start
+            if end is not None:
+                mask &= column('timestamp') < end
+            if location_code is not None:
+                mask &= column('location') == location_code
+            if hazard_code is not None:
+                mask &= column('hazard') == hazard_code
+
+            for name in columns:
+                selected[name].append(np.asarray(column(name)[mask]))
+
+        return manifest, {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=COLUMN_DTYPES[name])
+            for name, parts in selected.items()
+        }
+
+    def query(self, location=None, hazard=None, start=None, end=None,
+              columns=('timestamp', 'location', 'hazard', 'probability', 'risk_level')):
+        """Return matching predictions as a list of dicts, reading only the requested columns"""
+        manifest, data = self._select(location, hazard, start, end, columns)
+        count = len(next(iter(data.values()))) if data else 0
+
+        records = []
+        for i in range(count):
+            record = {}
+            for name in columns:
+                value = data[name][i]
+                if name == 'timestamp':
+                    record[name] = datetime.fromtimestamp(float(value)).isoformat()
+                elif name == 'location':
+                    record[name] = manifest['locations'][int(value)]
+                elif name == 'hazard':
+                    record[name] = HAZARDS[int(value)]
+                elif name == 'risk_level':
+                    record[name] = RISK_LEVELS[int(value)]
+                elif name == 'factors':
+                    record[name] = [round(float(v), 2) for v in value]
+                else:
+                    record[name] = round(float(value), 2)
+            records.append(record)
+        return records
+
+    def downsample(self, location=None, hazard=None, start=None, end=None, bucket_seconds=3600):
+        """Max and mean probability per time bucket (hourly by default) for dashboard charts"""
+        _, data = self._select(location, hazard, start, end, ('timestamp', 'probability'))
+        if len(data['timestamp']) == 0:
+            return []
+
+        buckets = np.floor(data['timestamp'] / bucket_seconds).astype(np.int64)
+        keys, inverse, counts = np.unique(buckets, return_inverse=True, return_counts=True)
+        probability = data['probability'].astype(np.float64)
+
+        sums = np.bincount(inverse, weights=probability)
+        maxima = np.full(len(keys), -np.inf)
+        np.maximum.at(maxima, inverse, probability)
+
+        return [
+            {
+                'bucket_start': datetime.fromtimestamp(int(key) * bucket_seconds).isoformat(),
+                'count': int(count),
+                'max_probability': round(float(maximum), 2),
+                'mean_probability': round(float(total / count), 2)
+            }
+            for key, count, maximum, total in zip(keys, counts, maxima, sums)
+        ]
+
+
+def run_history_query(data):
+    """Entry point for the 'history' CLI command"""
+    try:
+        archive = PredictionArchive()
+        filters = {
+            'location': data.get('location'),
+            'hazard': data.get('hazard'),
+            'start': data.get('start'),
+            'end': data.get('end')
+        }
+        if data.get('bucket_seconds'):
+            return archive.downsample(bucket_seconds=int(data['bucket_seconds']), **filters)
+        if data.get('columns'):
+            return archive.query(columns=tuple(data['columns']), **filters)
+        return archive.query(**filters)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def test_archive():
+    import tempfile
+    from flood_prediction import FloodPrediction
+
+    predictor = FloodPrediction()
+    archive = PredictionArchive(tempfile.mkdtemp(), chunk_size=100, buffer_size=50)
+    now = time.time()
+
+    for i in range(240):
+        result = predictor.predict_flood(
+            location="Lahore" if i % 2 else "Karachi",
+            rainfall_intensity=i % 10,
+            river_water_level=5,
+            soil_saturation=5,
+            drainage_capacity=5,
+            elevation_risk=5
+        )
+        archive.append('flood', result, timestamp=now - (240 - i) * 600)
+    archive.flush()
+
+    print("Prediction Archive Test:")
+    print(json.dumps(archive.query(location="Lahore", start=now - 3600)[:3], indent=2))
+    print(json.dumps(archive.downsample(location="Lahore", hazard="flood")[:3], indent=2))
+
+
+if __name__ == "__main__":
+    test_archive()
@@ -0,0 +1,150 @@
+import json
+import math
+import time
+import heapq
+from datetime import datetime
+from population_grid import find_city_coordinates
+
+EARTH_RADIUS_KM = 6371.0
+
+# Lifecycle of a dispatched team; each state is left by exactly one scheduled event
+NEXT_STATE = {
+    'en_route': 'on_scene',
+    'on_scene': 'returning',
+    'returning': 'available'
+}
+
+
+def haversine_km(origin, destination):
+    """Great-circle distance between two {'lat', 'lng'} points"""
+    lat1, lng1 = math.radians(origin['lat']), math.radians(origin['lng'])
+    lat2, lng2 = math.radians(destination['lat']), math.radians(destination['lng'])
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class TeamScheduler:
+    """
+    Discrete-event model of response teams: en_route -> on_scene -> returning -> available.
+    Pending transitions live in a heap keyed by due time, so advancing the clock costs
+    O(log n) per event. Superseded events are skipped lazily using a per-team version.
+    """
+    def __init__(self, clock=time.time, speed_kmh=60, road_factor=1.3, mobilization_minutes=5,
+                 min_on_scene_minutes=10):
+        self.clock = clock
+        self.speed_kmh = speed_kmh
+        self.mobilization_minutes = mobilization_minutes
+        self.road_factor = road_factor
+        self.min_on_scene_minutes = min_on_scene_minutes
+        self.events = []
+        self.sequence = 0
+        self.teams = {}
+        self.versions = {}
+        self.base_coordinates = {}
+        self.listeners = []
+
+    def _set_status(self, team, status):
+        old_status = team['status']
+        team['status'] = status
+        for listener in self.listeners:
+            listener.on_team_transition(team, old_status, status)
+
+    def register_team(self, team):
+        self.teams[team['id']] = team
+        self.versions.setdefault(team['id'], 0)
+        self.base_coordinates[team['id']] = find_city_coordinates(team['location'])
+
+    def travel_minutes(self, team, destination, fallback_minutes):
+        """Road travel time from the team's base, or the protocol response time when unknown"""
+        origin = self.base_coordinates.get(team['id'])
+        if not origin or not destination:
+            return float(fallback_minutes)
+        distance = haversine_km(origin, destination) * self.road_factor
+        return self.mobilization_minutes + distance / self.speed_kmh * 60
+
+    def _schedule(self, team, state, when):
+        self.versions[team['id']] += 1
+        self.sequence += 1
+        heapq.heappush(self.events, (when, self.sequence, team['id'], self.versions[team['id']], state))
+        team['next_status'] = state
+        team['next_transition_at'] = datetime.fromtimestamp(when).isoformat()
+
+    def dispatch(self, team, emergency_id, destination, travel_minutes, resolve_at):
+        """Send a team to an emergency; it stays on scene until resolve_at (epoch seconds)"""
+        now = self.clock()
+        arrival = now + travel_minutes * 60
+        self._set_status(team, 'en_route')
+        team['emergency_id'] = emergency_id
+        team['assigned_at'] = datetime.fromtimestamp(now).isoformat()
+        team['travel_minutes'] = round(travel_minutes, 1)
+        team['eta'] = datetime.fromtimestamp(arrival).isoformat()
+        team['on_scene_minutes'] = round(max((resolve_at - arrival) / 60, self.min_on_scene_minutes), 1)
+        self._schedule(team, 'on_scene', arrival)
+
+    def release(self, team):
+        """Emergency closed early: stop work and head back from wherever the team is"""
+        if team['status'] not in NEXT_STATE or team['status'] == 'returning':
+            return
+        now = self.clock()
+        if team['status'] == 'en_route':
+            started = datetime.fromisoformat(team['assigned_at']).timestamp()
+            back_minutes = (now - started) / 60
+        else:
+            back_minutes = team['travel_minutes']
+        self._set_status(team, 'returning')
+        self._schedule(team, 'available', now + back_minutes * 60)
+
+    def advance(self, now=None):
+        """Apply every transition due by now; returns the transitions applied in order"""
+        now = self.clock() if now is None else now
+        applied = []
+        while self.events and self.events[0][0] <= now:
+            when, _, team_id, version, state = heapq.heappop(self.events)
+            if version != self.versions[team_id]:
+                continue
+            team = self.teams[team_id]
+            self._set_status(team, state)
+            team['next_status'] = None
+            team['next_transition_at'] = None
+
+            if state == 'on_scene':
+                self._schedule(team, 'returning', when + team['on_scene_minutes'] * 60)
+            elif state == 'returning':
+                self._schedule(team, 'available', when + team['travel_minutes'] * 60)
+            else:
+                team['emergency_id'] = None
+                team['assigned_at'] = None
+                team['eta'] = None
+
+            applied.append({
+                'team_id': team_id,
+                'status': state,
+                'at': datetime.fromtimestamp(when).isoformat()
+            })
+        return applied
+
+    def next_event_time(self):
+        while self.events and self.events[0][3] != self.versions[self.events[0][2]]:
+            heapq.heappop(self.events)
+        return self.events[0][0] if self.events else None
+
+
+def test_scheduler():
+    clock = [time.time()]
+    scheduler = TeamScheduler(clock=lambda: clock[0])
+    team = {'id': 'RES002', 'type': 'Search & Rescue', 'location': 'Islamabad', 'status': 'available'}
+    scheduler.register_team(team)
+
+    destination = find_city_coordinates('Lahore')
+    travel = scheduler.travel_minutes(team, destination, 20)
+    scheduler.dispatch(team, 'demo', destination, travel, clock[0] + 3 * 3600)
+
+    print("Team Scheduler Test:")
+    while scheduler.next_event_time() is not None:
+        clock[0] = scheduler.next_event_time()
+        print(json.dumps(scheduler.advance()))
+
+
+if __name__ == "__main__":
+    test_scheduler()
@@ -0,0 +1,218 @@
+import json
+import numpy as np
+from earthquake_prediction import EarthquakePrediction
+from flood_prediction import FloodPrediction
+
+RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+
+# Input parameter -> predictor factor, in the order the predictors accept them.
+# Inverted parameters count against risk (more drainage capacity = less flooding).
+HAZARD_SPECS = {
+    'earthquake': {
+        'predictor': EarthquakePrediction,
+        'parameters': [
+            ('seismic_activity', 'seismic_activity', False),
+            ('geological_stress', 'geological_stress', False),
+            ('historical_frequency', 'historical_data', False),
+            ('tectonic_movement', 'tectonic_movement', False),
+            ('ground_water_change', 'ground_water_level', False)
+        ],
+        'thresholds': [30, 60, 80]
+    },
+    'flood': {
+        'predictor': FloodPrediction,
+        'parameters': [
+            ('rainfall_intensity', 'rainfall_intensity', False),
+            ('river_water_level', 'river_water_level', False),
+            ('soil_saturation', 'soil_saturation', False),
+            ('drainage_capacity', 'drainage_capacity', True),
+            ('elevation_risk', 'topography', False)
+        ],
+        'thresholds': [25, 50, 75]
+    }
+}
+
+
+class WhatIfEngine:
+    """
+    Vectorized what-if analysis over the earthquake and flood predictors.
+    Every query is evaluated as a single (points x parameters) matrix.
+    """
+    def __init__(self, hazard):
+        if hazard not in HAZARD_SPECS:
+            raise ValueError(f"Unknown hazard type: {hazard}")
+
+        spec = HAZARD_SPECS[hazard]
+        predictor = spec['predictor']()
+        self.hazard = hazard
+        self.parameters = [name for name, _, _ in spec['parameters']]
+        self.weights = np.array([predictor.risk_factors[factor] for _, factor, _ in spec['parameters']])
+        self.inverted = np.array([inverted for _, _, inverted in spec['parameters']])
+        self.thresholds = np.array(spec['thresholds'], dtype=np.float64)
+
+    def _base_vector(self, base):
+        return np.array([float(base.get(name, 0)) for name in self.parameters])
+
+    def _index(self, parameter):
+        if parameter not in self.parameters:
+            raise ValueError(f"Unknown {self.hazard} parameter: {parameter}")
+        return self.parameters.index(parameter)
+
+    def probabilities(self, points):
+        """Flood/earthquake probability for each row of a (n, parameters) array"""
+        inputs = np.clip(points, 0, 10)
+        inputs = np.where(self.inverted, 10 - inputs, inputs)
+        return np.minimum(inputs @ self.weights * 10, 100)
+
+    def risk_levels(self, probabilities):
+        """Risk level index (into RISK_LEVELS) for each probability"""
+        return np.searchsorted(self.thresholds, probabilities, side='right')
+
+    def sweep(self, base, x_parameter, x_values, y_parameter, y_values):
+        """Evaluate a dense grid over two parameters with all others held at base"""
+        x_index = self._index(x_parameter)
+        y_index = self._index(y_parameter)
+        x_values = np.asarray(x_values, dtype=np.float64)
+        y_values = np.asarray(y_values, dtype=np.float64)
+
+        points = np.tile(self._base_vector(base), (len(y_values) * len(x_values), 1))
+        grid_x, grid_y = np.meshgrid(x_values, y_values)
+        points[:, x_index] = grid_x.ravel()
+        points[:, y_index] = grid_y.ravel()
+
+        probability = self.probabilities(points).reshape(len(y_values), len(x_values))
+        levels = self.risk_levels(probability)
+
+        return {
+            'hazard': self.hazard,
+            'x_parameter': x_parameter,
+            'y_parameter': y_parameter,
+            'x_values': x_values.tolist(),
+            'y_values': y_values.tolist(),
+            'probability': np.round(probability, 2).tolist(),
+            'risk_level': [[RISK_LEVELS[level] for level in row] for row in levels.tolist()],
+            'contours': self.boundary_contours(probability, x_values, y_values)
+        }
+
+    def boundary_contours(self, probability, x_values, y_values):
+        """
+        Points where the probability crosses each risk-level threshold,
+        linearly interpolated between neighbouring grid points.
+        """
+        contours = {}
+        for threshold, level in zip(self.thresholds, RISK_LEVELS[1:]):
+            above = probability >= threshold
+            points = []
+
+            # Crossings between vertically adjacent cells
+            rows, cols = np.nonzero(above[1:, :] != above[:-1, :])
+            p0 = probability[rows, cols]
+            p1 = probability[rows + 1, cols]
+            t = (threshold - p0) / (p1 - p0)
+            ys = y_values[rows] + t * (y_values[rows + 1] - y_values[rows])
+            points.extend(zip(x_values[cols].tolist(), ys.tolist()))
+
+            # Crossings between horizontally adjacent cells
+            rows, cols = np.nonzero(above[:, 1:] != above[:, :-1])
+            p0 = probability[rows, cols]
+            p1 = probability[rows, cols + 1]
+            t = (threshold - p0) / (p1 - p0)
+            xs = x_values[cols] + t * (x_values[cols + 1] - x_values[cols])
+            points.extend(zip(xs.tolist(), y_values[rows].tolist()))
+
+            contours[level] = [[round(x, 4), round(y, 4)] for x, y in sorted(points)]
+        return contours
+
+    def sensitivity(self, base):
+        """
+        Per-parameter sensitivity around base, plus the change in each parameter alone
+        needed to leave the current risk level. The model is linear inside the 0-10 input
+        range, so slopes are the exact signed weights and crossings are solved directly.
+        """
+        values = np.clip(self._base_vector(base), 0, 10)
+        slopes = np.where(self.inverted, -1, 1) * self.weights * 10
+
+        # Solve against the uncapped score so a probability pinned at 100 still moves
+        score = float(np.where(self.inverted, 10 - values, values) @ self.weights * 10)
+        base_probability = min(score, 100)
+
+        level = int(self.risk_levels(base_probability))
+        with np.errstate(divide='ignore'):
+            if level > 0:
+                # Step just past the boundary so the result lands in the lower level
+                to_lower = (self.thresholds[level - 1] - score) / slopes - np.sign(slopes) * 1e-6
+            else:
+                to_lower = np.full(len(slopes), np.nan)
+            if level < len(self.thresholds):
+                to_higher = (self.thresholds[level] - score) / slopes
+            else:
+                to_higher = np.full(len(slopes), np.nan)
+
+        factors = {}
+        for i, name in enumerate(self.parameters):
+            factors[name] = {
+                'value': float(values[i]),
+                'probability_per_unit': round(float(slopes[i]), 4),
+                'change_to_lower_level': self._reachable_change(values[i], to_lower[i]),
+                'change_to_higher_level': self._reachable_change(values[i], to_higher[i])
+            }
+
+        return {
+            'hazard': self.hazard,
+            'probability': round(float(base_probability), 2),
+            'risk_level': RISK_LEVELS[level],
+            'factors': factors
+        }
+
+    def _reachable_change(self, value, change):
+        """Round a required change away from zero, or None when it would leave the 0-10 input range"""
+        if change is None or not np.isfinite(change) or not -1e-9 <= value + change <= 10 + 1e-9:
+            return None
+        # Rounding towards zero could stop just short of the boundary
+        return float(np.sign(change) * np.ceil(abs(change) * 1e4) / 1e4)
+
+
+def run_what_if(data):
+    """Entry point for the 'whatif' CLI command"""
+    try:
+        engine = WhatIfEngine(data.get('hazard', 'flood'))
+        base = data.get('base', {})
+        result = {'sensitivity': engine.sensitivity(base)}
+
+        sweep = data.get('sweep')
+        if sweep:
+            steps = int(sweep.get('steps', 100))
+            x_range = sweep.get('x_range', [0, 10])
+            y_range = sweep.get('y_range', [0, 10])
+            result['sweep'] = engine.sweep(
+                base,
+                sweep['x'], np.linspace(x_range[0], x_range[1], steps),
+                sweep['y'], np.linspace(y_range[0], y_range[1], steps)
+            )
+        result['location'] = data.get('location', base.get('location', 'Unknown Location'))
+        return result
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def test_what_if():
+    engine = WhatIfEngine('flood')
+    lahore = {
+        'rainfall_intensity': 8.5,
+        'river_water_level': 7.8,
+        'soil_saturation': 6.2,
+        'drainage_capacity': 3.5,
+        'elevation_risk': 7.0
+    }
+
+    sensitivity = engine.sensitivity(lahore)
+    sweep = engine.sweep(lahore, 'drainage_capacity', np.linspace(0, 10, 100),
+                         'rainfall_intensity', np.linspace(0, 10, 100))
+
+    print("What-If Analysis Test:")
+    print(json.dumps(sensitivity, indent=2))
+    print(json.dumps({level: len(points) for level, points in sweep['contours'].items()}, indent=2))
+
+
+if __name__ == "__main__":
+    test_what_if()